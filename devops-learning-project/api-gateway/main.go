@@ -185,6 +185,7 @@ func rootHandler(w http.ResponseWriter, r *http.Request) {
 		"version": "1.0.0",
 		"endpoints": map[string]string{
 			"POST /api/messages": "Send message to Kafka (proxied to producer)",
+			"POST /api/messages/sync": "Send message and wait for Kafka ack (proxied to producer)",
 			"POST /api/messages/batch": "Send batch messages (proxied to producer)",
 			"GET /api/messages": "Get consumed messages (proxied to consumer)",
 			"GET /api/stats": "Get consumer stats (proxied to consumer)",
@@ -217,6 +218,11 @@ func main() {
 		producerProxy.ServeHTTP(w, r)
 	})))
 	
+	http.HandleFunc("/api/messages/sync", corsMiddleware(loggingMiddleware(func(w http.ResponseWriter, r *http.Request) {
+		metrics.ProducerCalls++
+		producerProxy.ServeHTTP(w, r)
+	})))
+	
 	http.HandleFunc("/api/messages/batch", corsMiddleware(loggingMiddleware(func(w http.ResponseWriter, r *http.Request) {
 		metrics.ProducerCalls++
 		producerProxy.ServeHTTP(w, r)
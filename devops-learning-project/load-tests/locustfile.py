@@ -11,14 +11,42 @@ Run: locust -f locustfile.py --host=http://localhost:8080
 Then open http://localhost:8089 in your browser
 """
 
-from locust import HttpUser, task, between
+from locust import task, between
+from locust.contrib.fasthttp import FastHttpUser
 import json
+import logging
 import random
 
-class MessageUser(HttpUser):
+logger = logging.getLogger(__name__)
+
+# Payloads are encoded once up front and sampled by the tasks, so each
+# request doesn't pay for building and JSON-encoding a new dict
+POOL_SIZE = 1000
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+SINGLE_PAYLOADS = [
+    json.dumps({
+        "message": f"Test message {random.randint(1, 10000)}",
+        "user_id": f"user_{random.randint(1, 100)}"
+    }).encode("utf-8")
+    for _ in range(POOL_SIZE)
+]
+
+BATCH_PAYLOADS = [
+    json.dumps({
+        "messages": [f"Batch message {i}" for i in range(random.randint(5, 20))],
+        "user_id": f"batch_user_{random.randint(1, 50)}"
+    }).encode("utf-8")
+    for _ in range(POOL_SIZE)
+]
+
+class MessageUser(FastHttpUser):
     """
     Simulates a user sending messages to the API.
     Locust will spawn multiple instances of this user.
+    
+    FastHttpUser uses geventhttpclient (with keep-alive connections) instead
+    of requests, so one Locust worker can generate much more load.
     """
     
     # Wait between 1-3 seconds between tasks
@@ -27,17 +55,13 @@ class MessageUser(HttpUser):
     @task(3)  # Weight: 3 (runs 3x more often than other tasks)
     def send_single_message(self):
         """Send a single message to the producer"""
-        payload = {
-            "message": f"Test message {random.randint(1, 10000)}",
-            "user_id": f"user_{random.randint(1, 100)}"
-        }
-        
         with self.client.post(
             "/api/messages",
-            json=payload,
+            data=random.choice(SINGLE_PAYLOADS),
+            headers=JSON_HEADERS,
             catch_response=True
         ) as response:
-            if response.status_code == 201:
+            if response.status_code == 202:
                 response.success()
             else:
                 response.failure(f"Got status code {response.status_code}")
@@ -45,18 +69,13 @@ class MessageUser(HttpUser):
     @task(1)  # Weight: 1
     def send_batch_messages(self):
         """Send a batch of messages"""
-        batch_size = random.randint(5, 20)
-        payload = {
-            "messages": [f"Batch message {i}" for i in range(batch_size)],
-            "user_id": f"batch_user_{random.randint(1, 50)}"
-        }
-        
         with self.client.post(
             "/api/messages/batch",
-            json=payload,
+            data=random.choice(BATCH_PAYLOADS),
+            headers=JSON_HEADERS,
             catch_response=True
         ) as response:
-            if response.status_code == 201:
+            if response.status_code == 202:
                 response.success()
             else:
                 response.failure(f"Got status code {response.status_code}")
@@ -81,8 +100,8 @@ class MessageUser(HttpUser):
 
     def on_start(self):
         """Called when a simulated user starts"""
-        print(f"User {self.user_id} started")
+        logger.debug("User %s started", id(self))
     
     def on_stop(self):
         """Called when a simulated user stops"""
-        print(f"User {self.user_id} stopped")
+        logger.debug("User %s stopped", id(self))
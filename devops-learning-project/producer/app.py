@@ -12,11 +12,15 @@ This service demonstrates:
 The producer accepts HTTP POST requests and publishes messages to Kafka.
 """
 
-from flask import Flask, request, jsonify
-from kafka import KafkaProducer
-import json
+from flask import Flask, Response, request
+from confluent_kafka import Producer
+import orjson
 import os
+import time
+import atexit
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 
 # Configure logging to see what's happening
@@ -29,11 +33,38 @@ app = Flask(__name__)
 # This allows us to change config without changing code
 KAFKA_BROKER = os.getenv('KAFKA_BROKER', 'kafka:9092')
 KAFKA_TOPIC = os.getenv('KAFKA_TOPIC', 'messages')
+# lz4 is a good CPU/ratio tradeoff; use 'zstd' for better ratio at more CPU
+KAFKA_COMPRESSION = os.getenv('KAFKA_COMPRESSION', 'lz4')
+# 'all' for durability, '1' (leader only) when latency matters more
+KAFKA_ACKS = os.getenv('KAFKA_ACKS', 'all')
+# Batch endpoint sends in chunks of this many messages, serving delivery
+# reports with poll(0) between chunks
+BATCH_CHUNK_SIZE = 500
+# How long produce() may wait for room in librdkafka's local queue
+QUEUE_FULL_TIMEOUT = 10
 
 # Initialize Kafka Producer
 # This connects to the Kafka broker and prepares to send messages
 producer = None
 
+def json_response(payload, status=200):
+    """
+    Build a JSON response with orjson instead of Flask's stdlib-backed jsonify.
+    default=str covers any value orjson can't serialize natively.
+    """
+    return Response(
+        orjson.dumps(payload, default=str),
+        status=status,
+        mimetype='application/json'
+    )
+
+def _json():
+    """
+    Parse the request body with orjson, straight from the raw UTF-8 bytes
+    (skips Werkzeug's decode-to-str step). Raises orjson.JSONDecodeError.
+    """
+    return orjson.loads(request.get_data(cache=False))
+
 def get_kafka_producer():
     """
     Lazy initialization of Kafka producer.
@@ -42,38 +73,129 @@ def get_kafka_producer():
     global producer
     if producer is None:
         try:
-            producer = KafkaProducer(
-                bootstrap_servers=[KAFKA_BROKER],
-                # Serialize messages to JSON format
-                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+            # confluent-kafka wraps librdkafka (C), so protocol work and
+            # batching happen outside the Python interpreter.
+            # Callers pass key/value already encoded to bytes with
+            # message_key() and serialize_message().
+            producer = Producer({
+                'bootstrap.servers': KAFKA_BROKER,
                 # Wait for acknowledgment from Kafka leader
-                acks='all',
+                'acks': KAFKA_ACKS,
                 # Retry failed sends
-                retries=3
-            )
+                'retries': 3,
+                # Compress whole batches on the producer side (less network I/O)
+                'compression.type': KAFKA_COMPRESSION,
+                # Wait up to 10ms so messages from concurrent requests
+                # coalesce into the same partition batch
+                'linger.ms': 10,
+                'batch.size': 65536,
+                'batch.num.messages': 10000,
+                'max.in.flight.requests.per.connection': 5
+            })
+            # Deliver whatever is still queued when the worker exits
+            atexit.register(producer.flush, 10)
             logger.info(f"Connected to Kafka broker at {KAFKA_BROKER}")
         except Exception as e:
             logger.error(f"Failed to connect to Kafka: {e}")
             raise
     return producer
 
+# Fields of the health response that never change
+HEALTH_STATUS = {
+    'status': 'healthy',
+    'service': 'producer'
+}
+
+@lru_cache(maxsize=1)
+def _health_body(second):
+    """Encoded health response, rebuilt at most once per second."""
+    return orjson.dumps(
+        dict(HEALTH_STATUS, timestamp=datetime.utcfromtimestamp(second).isoformat())
+    )
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint for container orchestration.
     Kubernetes/Docker uses this to know if the container is healthy.
     """
-    return jsonify({
-        'status': 'healthy',
-        'service': 'producer',
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+    return Response(
+        _health_body(int(time.time())),
+        status=200,
+        mimetype='application/json'
+    )
+
+def _delivery_report(err, msg):
+    """
+    Delivery callback, served from producer.poll()/flush().
+    The request already returned, so on failure we can only log.
+    """
+    if err is not None:
+        logger.error(f"Error delivering message to Kafka: {err}")
+        return
+    logger.info(f"Message sent to topic {msg.topic()} partition {msg.partition()}")
+
+def _batch_delivery_report(err, msg):
+    """Delivery callback for batch sends - only failures are logged."""
+    if err is not None:
+        logger.error(f"Error delivering message to Kafka: {err}")
+
+@dataclass(slots=True)
+class OutgoingMessage:
+    """
+    Message published to Kafka. slots=True avoids a per-instance __dict__,
+    and orjson serializes dataclasses natively on its C fast path.
+    """
+    message: str
+    user_id: str
+    timestamp: str
+    service: str = 'producer'
+
+def serialize_message(message):
+    """Encode a message for Kafka (orjson emits UTF-8 bytes directly)."""
+    return orjson.dumps(message)
+
+def message_key(user_id):
+    """
+    Kafka message key. Keying by user sends all of a user's messages to the same
+    partition, so consumers can scale out per partition without reshuffling.
+    """
+    return str(user_id).encode('utf-8')
+
+def build_message(data, timestamp):
+    """Prepare message with metadata"""
+    return OutgoingMessage(
+        message=data['message'],
+        user_id=data.get('user_id', 'anonymous'),
+        timestamp=timestamp
+    )
+
+def produce_message(kafka_producer, key, value, callback):
+    """
+    produce() with backpressure. When librdkafka's local queue is full it
+    raises BufferError, so serve delivery reports and yield (a greenlet
+    switch under gevent) until there is room, then retry the same message.
+    """
+    deadline = time.monotonic() + QUEUE_FULL_TIMEOUT
+    while True:
+        try:
+            kafka_producer.produce(KAFKA_TOPIC, key=key, value=value, callback=callback)
+            return
+        except BufferError:
+            if time.monotonic() > deadline:
+                raise
+            kafka_producer.poll(0)
+            time.sleep(0.01)
 
 @app.route('/api/messages', methods=['POST'])
 def send_message():
     """
     API endpoint to receive messages and publish them to Kafka.
     
+    The message is queued and the request returns 202 right away, without
+    waiting for the Kafka acknowledgment. Use /api/messages/sync when the
+    caller needs the partition and offset.
+    
     Expected JSON body:
     {
         "message": "Your message here",
@@ -82,42 +204,96 @@ def send_message():
     """
     try:
         # Get JSON data from request
-        data = request.get_json()
+        data = _json()
         
         if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
+            return json_response({'error': 'Message is required'}, 400)
         
-        # Prepare message with metadata
-        message = {
-            'message': data['message'],
-            'user_id': data.get('user_id', 'anonymous'),
-            'timestamp': datetime.utcnow().isoformat(),
-            'service': 'producer'
-        }
+        message = build_message(data, datetime.utcnow().isoformat())
         
         # Get Kafka producer instance
         kafka_producer = get_kafka_producer()
         
         # Send message to Kafka topic
-        # This is asynchronous - message is queued and sent in background
-        future = kafka_producer.send(KAFKA_TOPIC, value=message)
+        # This is asynchronous - message is queued and sent in background,
+        # the acknowledgment is handled by the delivery callback
+        produce_message(
+            kafka_producer,
+            key=message_key(message.user_id),
+            value=serialize_message(message),
+            callback=_delivery_report
+        )
+        # Serve delivery reports of earlier sends (non-blocking)
+        kafka_producer.poll(0)
+        
+        return json_response({
+            'status': 'accepted',
+            'message': 'Message queued for Kafka',
+            'topic': KAFKA_TOPIC
+        }, 202)
+        
+    except orjson.JSONDecodeError:
+        return json_response({'error': 'Invalid JSON'}, 400)
+    except Exception as e:
+        logger.error(f"Error publishing message: {e}")
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/messages/sync', methods=['POST'])
+def send_message_sync():
+    """
+    Same as /api/messages, but waits for the Kafka acknowledgment and
+    returns the partition and offset the message was written to.
+    """
+    try:
+        data = _json()
         
-        # Wait for confirmation (optional, makes it synchronous)
-        record_metadata = future.get(timeout=10)
+        if not data or 'message' not in data:
+            return json_response({'error': 'Message is required'}, 400)
+        
+        message = build_message(data, datetime.utcnow().isoformat())
+        
+        kafka_producer = get_kafka_producer()
+        
+        delivery = {}
+        def on_delivery(err, msg):
+            delivery['err'] = err
+            delivery['msg'] = msg
+        
+        produce_message(
+            kafka_producer,
+            key=message_key(message.user_id),
+            value=serialize_message(message),
+            callback=on_delivery
+        )
         
-        logger.info(f"Message sent to topic {record_metadata.topic} partition {record_metadata.partition}")
+        # Wait for confirmation (makes it synchronous)
+        # poll(0) never blocks; the short sleep yields to other requests
+        deadline = time.monotonic() + 10
+        while 'msg' not in delivery:
+            if time.monotonic() > deadline:
+                raise TimeoutError('Timed out waiting for Kafka acknowledgment')
+            kafka_producer.poll(0)
+            time.sleep(0.001)
         
-        return jsonify({
+        if delivery['err'] is not None:
+            raise RuntimeError(str(delivery['err']))
+        
+        record_metadata = delivery['msg']
+        logger.info(f"Message sent to topic {record_metadata.topic()} partition {record_metadata.partition()}")
+        
+        return json_response({
             'status': 'success',
             'message': 'Message published to Kafka',
             'topic': KAFKA_TOPIC,
-            'partition': record_metadata.partition,
-            'offset': record_metadata.offset
-        }), 201
+            'partition': record_metadata.partition(),
+            'offset': record_metadata.offset()
+        }, 201)
         
+    except orjson.JSONDecodeError:
+        return json_response({'error': 'Invalid JSON'}, 400)
     except Exception as e:
         logger.error(f"Error publishing message: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/messages/batch', methods=['POST'])
 def send_batch_messages():
@@ -132,42 +308,62 @@ def send_batch_messages():
     }
     """
     try:
-        data = request.get_json()
+        data = _json()
         
         if not data or 'messages' not in data or not isinstance(data['messages'], list):
-            return jsonify({'error': 'Messages array is required'}), 400
+            return json_response({'error': 'Messages array is required'}, 400)
         
         kafka_producer = get_kafka_producer()
         sent_count = 0
         
-        # Send each message
-        for msg in data['messages']:
-            message = {
-                'message': msg,
-                'user_id': data.get('user_id', 'anonymous'),
-                'timestamp': datetime.utcnow().isoformat(),
-                'service': 'producer'
-            }
-            kafka_producer.send(KAFKA_TOPIC, value=message)
-            sent_count += 1
+        # Metadata is the same for the whole batch, compute it once
+        # (one timestamp formatting call per request, not per message)
+        ts = datetime.utcnow().isoformat()
+        uid = data.get('user_id', 'anonymous')
+        key = message_key(uid)
         
-        # Flush to ensure all messages are sent
-        kafka_producer.flush()
+        messages = data['messages']
         
-        logger.info(f"Batch of {sent_count} messages sent to Kafka")
+        # Send each message, already encoded to bytes, one chunk at a time
+        for start in range(0, len(messages), BATCH_CHUNK_SIZE):
+            for msg in messages[start:start + BATCH_CHUNK_SIZE]:
+                encoded = serialize_message(
+                    OutgoingMessage(message=msg, user_id=uid, timestamp=ts)
+                )
+                produce_message(
+                    kafka_producer,
+                    key=key,
+                    value=encoded,
+                    callback=_batch_delivery_report
+                )
+                sent_count += 1
+            
+            # Serve delivery reports before the next chunk; produce_message
+            # handles a full local queue by waiting for room
+            kafka_producer.poll(0)
         
-        return jsonify({
-            'status': 'success',
-            'messages_sent': sent_count,
+        # No flush() here: linger.ms/batch.size let librdkafka
+        # ship these together with messages from other requests
+        
+        logger.info(f"Batch of {sent_count} messages queued for Kafka")
+        
+        # Messages are only queued at this point; delivery is reported
+        # asynchronously, so answer 202 like /api/messages
+        return json_response({
+            'status': 'accepted',
+            'messages_queued': sent_count,
             'topic': KAFKA_TOPIC
-        }), 201
+        }, 202)
         
+    except orjson.JSONDecodeError:
+        return json_response({'error': 'Invalid JSON'}, 400)
     except Exception as e:
         logger.error(f"Error in batch send: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 if __name__ == '__main__':
-    # Run Flask app
+    # Run Flask's development server (local dev only)
+    # In the container gunicorn imports `app` instead, see gunicorn.conf.py
     # 0.0.0.0 makes it accessible from outside the container
     # Port 5000 is the default Flask port
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,26 @@
+"""
+GUNICORN CONFIGURATION
+======================
+
+Gunicorn loads this file automatically from the working directory.
+It replaces Flask's single-threaded development server with a pool of
+pre-forked worker processes.
+
+Each worker uses gevent, so while one request waits on Kafka the same
+worker can keep serving other requests.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Number of worker processes (set WEB_CONCURRENCY to match the container's
+# CPU limit). Not cpu_count(): inside a container that is the host's core
+# count, which ignores cgroup limits and would fork far too many workers.
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+
+# gevent worker: cooperative greenlets, sockets are monkey-patched
+worker_class = 'gevent'
+
+# Maximum concurrent connections handled by each worker
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', '1000'))
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration (loaded automatically from the working directory).
+
+Pre-forked gevent workers so I/O-bound handlers (Auth Service calls,
+Postgres queries) overlap instead of running one request at a time.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+# Small fixed default; cpu_count() reports the host's cores, not the
+# container's CPU limit. Set WEB_CONCURRENCY per deployment.
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+worker_class = 'gevent'
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', '1000'))
+
+
+def post_fork(server, worker):
+    # psycopg2 is a C extension that gevent can't monkey-patch, so make it
+    # yield to the event loop while waiting on Postgres
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -0,0 +1,39 @@
+"""create user_profiles
+
+Revision ID: 4f1c2a9d7b3e
+Revises: 
+Create Date: 2026-10-14 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9d7b3e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created before migrations were added already have this table
+    # (made by db.create_all()); adopt it instead of failing on DuplicateTable
+    if sa.inspect(op.get_bind()).has_table('user_profiles'):
+        return
+
+    op.create_table('user_profiles',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+
+
+def downgrade():
+    op.drop_table('user_profiles')